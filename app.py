@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 import pandas as pd
 
@@ -7,6 +11,8 @@ from merge_lib import (
     DEFAULT_ENCODING,
     COMMON_ENCODINGS,
     MergeOptions,
+    frame_from_ipc_bytes,
+    frame_to_ipc_bytes,
     read_csv_bytes,
     merge_frames,
     to_csv_bytes,
@@ -15,6 +21,19 @@ from merge_lib import (
 st.set_page_config(page_title="CSV Merge Tool", layout="wide")
 st.title("CSV Merge Tool (Online)")
 
+
+# Streamlit re-runs the script on every widget change; hashing the upload
+# bytes is far cheaper than re-parsing them. Cached frames are stored as
+# lz4-compressed Arrow IPC bytes, which also keeps the cache small.
+@st.cache_data(max_entries=32, show_spinner=False,
+               hash_funcs={bytes: lambda b: hashlib.blake2b(b).digest()})
+def _cached_read(b: bytes, delimiter, encoding, sniff):
+    df, used_delim, used_enc = read_csv_bytes(
+        b, delimiter=delimiter, encoding=encoding, sniff=sniff
+    )
+    ipc = frame_to_ipc_bytes(df)
+    return (ipc if ipc is not None else df), used_delim, used_enc
+
 with st.sidebar:
     st.header("Einstellungen")
 
@@ -75,18 +94,23 @@ if total_size > 200 * 1024 * 1024:
     st.error("Zu groß: Bitte insgesamt < 200 MB hochladen.")
     st.stop()
 
-frames: list[pd.DataFrame] = []
-names: list[str] = []
-delims: list[str] = []
-encs: list[str] = []
-
-for u in uploads:
-    b = u.getvalue()
-    df, used_delim, used_enc = read_csv_bytes(b, delimiter=opt.delimiter, encoding=opt.encoding)
-    frames.append(df)
-    names.append(u.name)
-    delims.append(used_delim)
-    encs.append(used_enc)
+# fetch bytes on the main thread, parse in parallel (the C/pyarrow engines
+# release the GIL while tokenizing)
+payloads = [u.getvalue() for u in uploads]
+names = [u.name for u in uploads]
+
+def _parse(b: bytes):
+    payload, used_delim, used_enc = _cached_read(b, opt.delimiter, opt.encoding, opt.sniff)
+    if isinstance(payload, bytes):
+        payload = frame_from_ipc_bytes(payload)
+    return payload, used_delim, used_enc
+
+with ThreadPoolExecutor(max_workers=min(len(uploads), os.cpu_count() or 1)) as ex:
+    results = list(ex.map(_parse, payloads))
+
+frames = [df for df, _, _ in results]
+delims = [d for _, d, _ in results]
+encs = [e for _, _, e in results]
 
 st.info(
     "Erkannt/benutzt → "
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
 import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List
 
 from merge_lib import (
     DEFAULT_ENCODING,
     MergeOptions,
-    read_csv_bytes,
+    guess_delimiter,
+    iter_merge_chunks,
+    read_csv_source,
     merge_frames,
     to_csv_bytes,
+    write_csv_stream,
 )
 
 
@@ -45,6 +50,7 @@ def main() -> None:
     ap.add_argument("--how", choices=["union", "intersection", "strict"], default="union")
     ap.add_argument("--add-source", action="store_true", help="Spalte _source_file hinzufügen")
     ap.add_argument("--dedupe", action="store_true", help="Nur smart: Duplikate entfernen")
+    ap.add_argument("--no-sniff", action="store_true", help="Delimiter-Tie-Break überspringen (nur Zähl-Heuristik)")
 
     args = ap.parse_args()
 
@@ -59,28 +65,49 @@ def main() -> None:
         encoding=args.encoding,
         add_source=bool(args.add_source),
         dedupe=bool(args.dedupe),
+        sniff=not args.no_sniff,
     )
 
-    frames = []
-    names = []
-    delims = []
-    encs = []
-
-    for f in files:
-        b = f.read_bytes()
-        df, used_delim, used_enc = read_csv_bytes(b, delimiter=opt.delimiter, encoding=opt.encoding)
-        frames.append(df)
-        names.append(f.name)
-        delims.append(used_delim)
-        encs.append(used_enc)
+    out_path = Path(args.output)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    names = [f.name for f in files]
+
+    if opt.mode == "fast":
+        # streaming passthrough: write blocks of chunk_rows rows straight to
+        # the output file instead of loading everything and concatenating
+        with open(files[0], "rb") as fh:
+            sample = fh.read(4096)
+        out_delim = opt.delimiter or guess_delimiter(sample, sniff=opt.sniff)
+        rows, cols = write_csv_stream(
+            iter_merge_chunks(files, names, opt),
+            out_path,
+            delimiter=out_delim,
+            encoding=opt.encoding,
+        )
+        print(
+            f"OK: {len(files)} Datei(en) -> {out_path} | rows={rows} cols={cols} "
+            f"| delim={repr(out_delim)} mode={opt.mode}"
+        )
+        return
+
+    # files are independent and the C/pyarrow engines release the GIL while
+    # parsing, so a thread pool scales with the core count
+    def _load(f: Path):
+        return read_csv_source(
+            f, delimiter=opt.delimiter, encoding=opt.encoding, sniff=opt.sniff
+        )
+
+    with ThreadPoolExecutor(max_workers=min(len(files), os.cpu_count() or 1)) as ex:
+        results = list(ex.map(_load, files))
+
+    frames = [df for df, _, _ in results]
+    delims = [d for _, d, _ in results]
+    encs = [e for _, _, e in results]
 
     merged = merge_frames(frames, names, opt)
 
     out_delim = opt.delimiter or delims[0] or ";"
     out_bytes = to_csv_bytes(merged, delimiter=out_delim, encoding=opt.encoding)
-
-    out_path = Path(args.output)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
     out_path.write_bytes(out_bytes)
 
     print(
@@ -1,12 +1,22 @@
 from __future__ import annotations
 
-import csv
+import codecs
+import functools
 import io
 from dataclasses import dataclass
+from pathlib import Path
 from typing import List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa  # optional: faster multithreaded CSV reader/writer
+    import pyarrow.csv as pa_csv
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
 
 DEFAULT_ENCODING = "utf-8-sig"
 COMMON_ENCODINGS = ["utf-8-sig", "utf-8", "cp1252", "latin1"]  # pragmatic EU defaults
@@ -20,16 +30,29 @@ class MergeOptions:
     encoding: str            # e.g. "auto" | "utf-8-sig" | "cp1252" ...
     add_source: bool         # add _source_file column
     dedupe: bool             # drop duplicates (only smart)
+    sniff: bool = True       # allow per-line tie-break for ambiguous delimiters
+    chunk_rows: int = 500_000  # chunk size for the streaming fast merge
 
 
-def guess_delimiter(sample_text: str) -> str:
+def guess_delimiter(sample: bytes, *, sniff: bool = True) -> str:
+    # Count candidates directly on raw bytes (they are ASCII in every
+    # supported encoding, so no decode is needed)
     candidates = [",", ";", "\t", "|"]
-    try:
-        dialect = csv.Sniffer().sniff(sample_text, delimiters=candidates)
-        return dialect.delimiter
-    except Exception:
-        counts = {c: sample_text.count(c) for c in candidates}
-        return max(counts, key=counts.get) if any(counts.values()) else ";"
+    head = sample[:4096]
+    counts = {c: head.count(c.encode("ascii")) for c in candidates}
+    ranked = sorted(candidates, key=counts.get, reverse=True)
+    top, second = counts[ranked[0]], counts[ranked[1]]
+    if top == 0:
+        return ";"
+    if not sniff or top >= 3 * second:
+        return ranked[0]
+    # Tie-break: a real delimiter appears a constant number of times per line
+    lines = [ln for ln in head.split(b"\n")[:20] if ln]
+    for cand in ranked:
+        per_line = [ln.count(cand.encode("ascii")) for ln in lines]
+        if per_line and per_line[0] > 0 and all(n == per_line[0] for n in per_line):
+            return cand
+    return ranked[0]
 
 
 def _encoding_try_order(requested: Optional[str]) -> List[str]:
@@ -48,64 +71,220 @@ def _encoding_try_order(requested: Optional[str]) -> List[str]:
     return out
 
 
-def read_csv_bytes(
-    file_bytes: bytes,
+@functools.cache
+def _supports_encoding_errors() -> bool:
+    # pandas >= 1.5 knows encoding_errors; check once per interpreter
+    try:
+        major, minor = (int(x) for x in pd.__version__.split(".")[:2])
+    except ValueError:
+        return True  # dev/rc versions are new enough
+    return (major, minor) >= (1, 5)
+
+
+def _detect_encoding(sample: bytes, enc_order: List[str], truncated: bool = False) -> str:
+    # Probe the encoding on a prefix up front instead of re-running the full
+    # parser per candidate
+    for enc in enc_order:
+        try:
+            sample.decode(enc, errors="strict")
+            return enc
+        except UnicodeDecodeError as e:
+            # a multibyte sequence cut off at the sample boundary is fine
+            if truncated and e.start >= len(sample) - 4:
+                return enc
+            continue
+    return enc_order[-1] if enc_order else "latin1"
+
+
+def _detect_encoding_path(path: Path, enc_order: List[str]) -> str:
+    # Like _detect_encoding but verified against the whole file (incremental
+    # decoder, 1 MB blocks). The streaming merge needs this: chunks already
+    # written out cannot be re-decoded with a different encoding.
+    with open(path, "rb") as fh:
+        sample = fh.read(65536)
+    if path.stat().st_size <= len(sample):
+        return _detect_encoding(sample, enc_order)
+
+    first = _detect_encoding(sample, enc_order, truncated=True)
+    candidates = [first] + [e for e in enc_order if e != first]
+    for enc in candidates:
+        decoder = codecs.getincrementaldecoder(enc)("strict")
+        try:
+            with open(path, "rb") as fh:
+                while True:
+                    block = fh.read(1 << 20)
+                    if not block:
+                        decoder.decode(b"", final=True)
+                        break
+                    decoder.decode(block)
+            return enc
+        except UnicodeDecodeError:
+            continue
+    return candidates[-1]
+
+
+def _engine_order(sep: str, allow_pyarrow: bool = True) -> List[str]:
+    # The C engine (and pyarrow, if installed) is far faster than
+    # engine="python"; only multi-char/regex separators need the Python parser
+    if sep is not None and len(sep) == 1:
+        pa_first = ["pyarrow"] if (_HAS_PYARROW and allow_pyarrow) else []
+        return pa_first + ["c"]
+    return ["python"]
+
+
+# Arrow strings are contiguous offsets+bytes buffers instead of boxed Python
+# objects: much less RAM, no pointer-chasing on concat/dedupe
+_STR_DTYPE = "string[pyarrow]" if _HAS_PYARROW else str
+
+
+def _read_once(src, sep: str, enc: str, **extra) -> pd.DataFrame:
+    # src: raw bytes or a path; paths go straight to pd.read_csv so the
+    # C/pyarrow engine can memory-map the file
+    last_err: Optional[Exception] = None
+    # the pyarrow engine does not honor encoding_errors reliably
+    allow_pyarrow = "encoding_errors" not in extra
+    for engine in _engine_order(sep, allow_pyarrow):
+        kwargs = dict(extra)
+        if engine == "c":
+            # dtype is fixed, so low_memory block-wise inference only adds cost
+            kwargs["low_memory"] = False
+            if not isinstance(src, bytes):
+                kwargs["memory_map"] = True
+        try:
+            return pd.read_csv(
+                io.BytesIO(src) if isinstance(src, bytes) else src,
+                sep=sep,
+                dtype=_STR_DTYPE,
+                encoding=enc,
+                keep_default_na=False,
+                na_filter=False,
+                engine=engine,
+                **kwargs,
+            )
+        except UnicodeDecodeError:
+            raise
+        except (ValueError, TypeError, NotImplementedError) as e:
+            # engine does not support an option (mostly pyarrow) -> next one
+            last_err = e
+            continue
+    raise last_err  # type: ignore[misc]
+
+
+def _read_csv_any(
+    src,
+    sample: bytes,
+    truncated: bool,
     *,
     delimiter: Optional[str],
     encoding: str,
+    sniff: bool = True,
 ) -> Tuple[pd.DataFrame, str, str]:
-    # Delimiter detection: decode a small sample with replacement to avoid crashes
-    sample_text = file_bytes[:8192].decode("utf-8", errors="replace")
-    used_delim = delimiter or guess_delimiter(sample_text)
+    used_delim = delimiter or guess_delimiter(sample, sniff=sniff)
 
     enc_order = _encoding_try_order(encoding)
+    enc = _detect_encoding(sample, enc_order, truncated)
     last_err: Optional[Exception] = None
 
-    # First: strict decoding attempts
-    for enc in enc_order:
+    # encoding is known up front -> the parser runs exactly once
+    try:
+        df = _read_once(src, used_delim, enc)
+        return df, used_delim, enc
+    except UnicodeDecodeError as e:
+        # the sample missed bad bytes further in; try the remaining
+        # candidates strictly before losing characters
+        last_err = e
+
+    for other in enc_order:
+        if other == enc:
+            continue
         try:
-            df = pd.read_csv(
-                io.BytesIO(file_bytes),
-                sep=used_delim,
-                dtype=str,
-                encoding=enc,
-                keep_default_na=False,
-                na_filter=False,
-                engine="python",
-            )
-            return df, used_delim, enc
+            df = _read_once(src, used_delim, other)
+            return df, used_delim, other
         except UnicodeDecodeError as e:
             last_err = e
-            continue
 
     # Last resort: replace bad bytes (prevents Streamlit crash)
-    fallback_enc = enc_order[-1] if enc_order else "latin1"
-    try:
-        df = pd.read_csv(
-            io.BytesIO(file_bytes),
-            sep=used_delim,
-            dtype=str,
-            encoding=fallback_enc,
-            encoding_errors="replace",  # pandas >= 1.5/2.x
-            keep_default_na=False,
-            na_filter=False,
-            engine="python",
-        )
-        return df, used_delim, fallback_enc
-    except TypeError:
-        # Older pandas: decode ourselves then parse from text buffer
-        text = file_bytes.decode(fallback_enc, errors="replace")
-        df = pd.read_csv(
-            io.StringIO(text),
-            sep=used_delim,
-            dtype=str,
-            keep_default_na=False,
-            na_filter=False,
-            engine="python",
-        )
-        return df, used_delim, fallback_enc
-    except Exception as e:
-        raise last_err or e
+    fallback_enc = enc
+    if _supports_encoding_errors():
+        try:
+            df = _read_once(src, used_delim, fallback_enc, encoding_errors="replace")
+            return df, used_delim, fallback_enc
+        except Exception as e:
+            raise last_err or e
+
+    # Older pandas: decode ourselves then parse from text buffer
+    data = src if isinstance(src, bytes) else Path(src).read_bytes()
+    text = data.decode(fallback_enc, errors="replace")
+    df = pd.read_csv(
+        io.StringIO(text),
+        sep=used_delim,
+        dtype=str,
+        keep_default_na=False,
+        na_filter=False,
+        engine="python",
+    )
+    return df, used_delim, fallback_enc
+
+
+def read_csv_bytes(
+    file_bytes: bytes,
+    *,
+    delimiter: Optional[str],
+    encoding: str,
+    sniff: bool = True,
+) -> Tuple[pd.DataFrame, str, str]:
+    sample = file_bytes[:65536]
+    truncated = len(file_bytes) > len(sample)
+    return _read_csv_any(
+        file_bytes, sample, truncated,
+        delimiter=delimiter, encoding=encoding, sniff=sniff,
+    )
+
+
+def read_csv_source(
+    path,
+    *,
+    delimiter: Optional[str],
+    encoding: str,
+    sniff: bool = True,
+) -> Tuple[pd.DataFrame, str, str]:
+    # Like read_csv_bytes but straight from a path: the file is not copied
+    # into the Python heap first, pandas/pyarrow can memory-map it
+    path = Path(path)
+    with open(path, "rb") as fh:
+        sample = fh.read(65536)
+    truncated = path.stat().st_size > len(sample)
+    return _read_csv_any(
+        path, sample, truncated,
+        delimiter=delimiter, encoding=encoding, sniff=sniff,
+    )
+
+
+def _drop_duplicates(df: pd.DataFrame) -> pd.DataFrame:
+    # Arrow dedupes via vectorized hash kernels on the string buffers;
+    # use_threads=False keeps first-occurrence order stable
+    if _HAS_PYARROW:
+        try:
+            tbl = pa.Table.from_pandas(df, preserve_index=False)
+            tbl = tbl.group_by(tbl.column_names, use_threads=False).aggregate([])
+            return tbl.to_pandas(types_mapper=pd.ArrowDtype)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass
+    return df.drop_duplicates()
+
+
+def _source_column(names: List[str], lengths: List[int]) -> pd.Categorical:
+    # one Categorical from codes instead of N object arrays of the same string
+    cats: List[str] = []
+    code_of = {}
+    for n in names:
+        if n not in code_of:
+            code_of[n] = len(cats)
+            cats.append(n)
+    codes = np.repeat(
+        np.array([code_of[n] for n in names], dtype=np.int32), lengths
+    )
+    return pd.Categorical.from_codes(codes, categories=cats)
 
 
 def merge_frames(frames: List[pd.DataFrame], names: List[str], opt: MergeOptions) -> pd.DataFrame:
@@ -114,13 +293,11 @@ def merge_frames(frames: List[pd.DataFrame], names: List[str], opt: MergeOptions
     if len(frames) != len(names):
         raise ValueError("frames/names Längen stimmen nicht überein.")
 
-    if opt.add_source:
-        frames = [df.assign(_source_file=name) for df, name in zip(frames, names)]
-
     if opt.mode == "fast":
-        cols0 = list(frames[0].columns)
+        ref = frames[0].columns
+        cols0 = list(ref)
         for i, df in enumerate(frames[1:], start=2):
-            if list(df.columns) != cols0:
+            if not df.columns.equals(ref):
                 raise ValueError(
                     "FAST-Modus erfordert identische Spaltenreihenfolge.\n"
                     f"Abweichung in Datei #{i}: {names[i-1]}\n"
@@ -128,31 +305,53 @@ def merge_frames(frames: List[pd.DataFrame], names: List[str], opt: MergeOptions
                     f"Gefunden: {list(df.columns)}\n"
                     "Tipp: Nutze SMART-Modus."
                 )
-        merged = pd.concat(frames, ignore_index=True)
+        # Blit each output column once instead of assign + concat (2N copies).
+        # Extension/Arrow columns skip the NumPy route: it would materialize
+        # them to object arrays, pd.concat links their chunks instead.
+        if all(isinstance(dt, np.dtype) for dt in frames[0].dtypes):
+            data = {
+                c: np.concatenate([df[c].to_numpy(copy=False) for df in frames])
+                for c in cols0
+            }
+            merged = pd.DataFrame(data, columns=cols0)
+        else:
+            merged = pd.concat(frames, ignore_index=True)
+        if opt.add_source:
+            merged["_source_file"] = _source_column(names, [len(df) for df in frames])
 
     elif opt.mode == "smart":
-        merged = pd.concat(frames, ignore_index=True, sort=False)
-
         if opt.how == "intersection":
-            common = set(frames[0].columns)
+            # project to the common columns BEFORE the concat so dropped
+            # columns are never copied; Index.intersection keeps the first
+            # file's column order
+            common = frames[0].columns
             for df in frames[1:]:
-                common &= set(df.columns)
-            merged = merged[[c for c in merged.columns if c in common]]
+                common = common.intersection(df.columns)
+            merged = pd.concat(
+                [df.loc[:, common] for df in frames], ignore_index=True
+            )
 
         elif opt.how == "strict":
-            cols0 = list(frames[0].columns)
+            ref = frames[0].columns
             for i, df in enumerate(frames[1:], start=2):
-                if list(df.columns) != cols0:
+                if not df.columns.equals(ref):
                     raise ValueError(
                         "STRICT erwartet identische Spaltenreihenfolge.\n"
                         f"Abweichung in Datei #{i}: {names[i-1]}"
                     )
+            merged = pd.concat(frames, ignore_index=True, sort=False)
+
+        elif opt.how == "union":
+            merged = pd.concat(frames, ignore_index=True, sort=False)
 
-        elif opt.how != "union":
+        else:
             raise ValueError(f"Unbekanntes how='{opt.how}' (erwartet union/intersection/strict).")
 
+        if opt.add_source:
+            merged["_source_file"] = _source_column(names, [len(df) for df in frames])
+
         if opt.dedupe:
-            merged = merged.drop_duplicates()
+            merged = _drop_duplicates(merged)
 
     else:
         raise ValueError("mode muss 'fast' oder 'smart' sein.")
@@ -160,7 +359,176 @@ def merge_frames(frames: List[pd.DataFrame], names: List[str], opt: MergeOptions
     return merged
 
 
+# Above this total size the byte-concat fast path would keep the whole
+# combined buffer in RAM and defeat the point of streaming
+_CONCAT_BYTES_LIMIT = 128 * 1024 * 1024
+
+
+def _chunk_reader(src, used_delim: str, enc: str, opt: MergeOptions):
+    # enc was verified strictly beforehand; replace only covers the
+    # theoretical case that no candidate decoded the input
+    engine = "c" if len(used_delim) == 1 else "python"
+    extra = {}
+    if engine == "c" and not isinstance(src, bytes):
+        extra["memory_map"] = True
+    if _supports_encoding_errors():
+        extra["encoding_errors"] = "replace"
+    return pd.read_csv(
+        io.BytesIO(src) if isinstance(src, bytes) else src,
+        sep=used_delim,
+        dtype=_STR_DTYPE,
+        encoding=enc,
+        keep_default_na=False,
+        na_filter=False,
+        engine=engine,
+        chunksize=opt.chunk_rows,
+        **extra,
+    )
+
+
+def _try_concat_bytes(paths: List, opt: MergeOptions) -> Optional[bytes]:
+    # Many small files: concatenate the bodies and parse ONCE (amortizes
+    # parser init and block construction). Only applicable when header line
+    # and detected encoding match exactly; otherwise None and the caller
+    # parses per file.
+    paths = [Path(p) for p in paths]
+    if sum(p.stat().st_size for p in paths) > _CONCAT_BYTES_LIMIT:
+        return None
+
+    enc_order = _encoding_try_order(opt.encoding)
+    out = io.BytesIO()
+    header: Optional[bytes] = None
+    enc0: Optional[str] = None
+    for p in paths:
+        b = p.read_bytes()
+        nl = b.find(b"\n")
+        if nl < 0:
+            return None
+        enc = _detect_encoding(b[:65536], enc_order, len(b) > 65536)
+        if header is None:
+            header, enc0 = b[: nl + 1], enc
+            out.write(b)
+        else:
+            if b[: nl + 1] != header or enc != enc0:
+                return None
+            out.write(b[nl + 1:])
+        if not b.endswith(b"\n"):
+            out.write(b"\n")
+    return out.getvalue()
+
+
+def frame_to_ipc_bytes(df: pd.DataFrame) -> Optional[bytes]:
+    # Serialize as an lz4-compressed Arrow IPC stream (3-5x smaller for CSV
+    # text, decompresses at >2 GB/s). None without pyarrow or for columns
+    # Arrow cannot convert.
+    if not _HAS_PYARROW:
+        return None
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        options = pa.ipc.IpcWriteOptions(compression="lz4")
+        with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return None
+
+
+def frame_from_ipc_bytes(b: bytes) -> pd.DataFrame:
+    # counterpart to frame_to_ipc_bytes
+    with pa.ipc.open_stream(b) as reader:
+        table = reader.read_all()
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def iter_merge_chunks(paths: List, names: List[str], opt: MergeOptions):
+    # Streaming fast merge: read each file in blocks of opt.chunk_rows rows
+    # and yield partial DataFrames, keeping peak memory at ~one block
+    if not paths:
+        raise ValueError("Keine Dateien zum Mergen übergeben.")
+    if len(paths) != len(names):
+        raise ValueError("paths/names Längen stimmen nicht überein.")
+
+    # without _source_file nobody needs the file boundaries -> one parse
+    # over the concatenated buffer instead of N parser starts
+    if not opt.add_source and len(paths) > 1:
+        combined = _try_concat_bytes(paths, opt)
+        if combined is not None:
+            used_delim = opt.delimiter or guess_delimiter(combined, sniff=opt.sniff)
+            # the full buffer is in memory -> strict check over all of it
+            enc = _detect_encoding(combined, _encoding_try_order(opt.encoding))
+            with _chunk_reader(combined, used_delim, enc, opt) as reader:
+                yield from reader
+            return
+
+    cols0: Optional[List[str]] = None
+    for i, (path, name) in enumerate(zip(paths, names), start=1):
+        path = Path(path)
+        with open(path, "rb") as fh:
+            sample = fh.read(65536)
+        used_delim = opt.delimiter or guess_delimiter(sample, sniff=opt.sniff)
+        enc = _detect_encoding_path(path, _encoding_try_order(opt.encoding))
+
+        with _chunk_reader(path, used_delim, enc, opt) as reader:
+            for chunk in reader:
+                cols = list(chunk.columns)
+                if cols0 is None:
+                    cols0 = cols
+                elif cols != cols0:
+                    raise ValueError(
+                        "FAST-Modus erfordert identische Spaltenreihenfolge.\n"
+                        f"Abweichung in Datei #{i}: {name}\n"
+                        f"Erwartet: {cols0}\n"
+                        f"Gefunden: {cols}\n"
+                        "Tipp: Nutze SMART-Modus."
+                    )
+                if opt.add_source:
+                    chunk["_source_file"] = name
+                yield chunk
+
+
+def write_csv_stream(chunks, out_path, *, delimiter: str, encoding: str) -> Tuple[int, int]:
+    # write the chunks from iter_merge_chunks to a file (header only once);
+    # returns (rows, cols)
+    enc = encoding if encoding and encoding.lower() != "auto" else DEFAULT_ENCODING
+    rows = 0
+    cols = 0
+    first = True
+    with open(out_path, "w", encoding=enc, newline="") as fh:
+        for chunk in chunks:
+            chunk.to_csv(fh, index=False, sep=delimiter, header=first)
+            first = False
+            rows += len(chunk)
+            cols = len(chunk.columns)
+    return rows, cols
+
+
 def to_csv_bytes(df: pd.DataFrame, *, delimiter: str, encoding: str) -> bytes:
     # When exporting, utf-8-sig is usually Excel-friendly
     enc = encoding if encoding and encoding.lower() != "auto" else DEFAULT_ENCODING
+
+    # Arrow formats and encodes in C straight to bytes; the pandas writer
+    # formats object columns row by row and then re-encodes the whole str.
+    # Arrow only writes UTF-8, so cp1252/latin1 and multi-char delimiters
+    # stay on the pandas path.
+    if _HAS_PYARROW and len(delimiter) == 1 and enc.lower() in ("utf-8", "utf8", "utf-8-sig"):
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            buf = pa.BufferOutputStream()
+            # Note: Arrow quotes every string field regardless of
+            # quoting_style (verified on pyarrow 25), so the output is fully
+            # quoted instead of minimally quoted -- still valid RFC 4180 and
+            # parses back to identical values.
+            pa_csv.write_csv(
+                table,
+                buf,
+                write_options=pa_csv.WriteOptions(delimiter=delimiter),
+            )
+            out = buf.getvalue().to_pybytes()
+            if enc.lower() == "utf-8-sig":
+                out = b"\xef\xbb\xbf" + out
+            return out
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass  # exotic column types -> pandas writer
+
     return df.to_csv(index=False, sep=delimiter, encoding=enc).encode(enc)